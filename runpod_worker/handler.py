@@ -1,28 +1,98 @@
-import base64
+import asyncio
+import concurrent.futures
 import os
+import select
+import socket
 import subprocess
 import time
 import threading
 import sys
-from typing import Any, Dict, Optional, Tuple
+from email.message import Message
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
-import requests
+import msgspec
+import pybase64
 import runpod
-
-# Minimal imports to check environment if possible, otherwise we rely on subprocess/logs
-try:
-    import torch
-    TORCH_AVAILABLE = True
-except ImportError:
-    TORCH_AVAILABLE = False
+import urllib3
+from msgspec import UNSET, UnsetType
+from urllib3.connection import HTTPConnection
 
 
 KOKORO_BASE_URL = os.environ.get("KOKORO_BASE_URL", "http://127.0.0.1:8880").rstrip("/")
-KOKORO_HEALTH_URL = f"{KOKORO_BASE_URL}/health"
-KOKORO_SPEECH_URL = f"{KOKORO_BASE_URL}/v1/audio/speech"
+KOKORO_HEALTH_PATH = "/health"
+KOKORO_SPEECH_PATH = "/v1/audio/speech"
+KOKORO_HEALTH_URL = f"{KOKORO_BASE_URL}{KOKORO_HEALTH_PATH}"
+KOKORO_SPEECH_URL = f"{KOKORO_BASE_URL}{KOKORO_SPEECH_PATH}"
+
+# The direct uvicorn fallback listens on a Unix domain socket instead of loopback TCP.
+KOKORO_UDS_PATH = os.environ.get("KOKORO_UDS_PATH", "/tmp/kokoro.sock")
+
+# Kokoro synthesizes at 24 kHz; used when the response Content-Type carries no `rate` parameter.
+KOKORO_DEFAULT_SAMPLE_RATE = 24000
+
+# Upper bound on a single synth request, for both the HTTP and the in-process path.
+KOKORO_SPEECH_TIMEOUT_S = 300
+
+# Read size for streamed audio; a multiple of 3 so each chunk base64-encodes without padding.
+AUDIO_CHUNK_SIZE = 3 * 65536
+
+# Default headers for every request to the local server. Audio is already compressed,
+# so skip gzip negotiation/decompression.
+KOKORO_HEADERS = {
+    "Connection": "keep-alive",
+    "Content-Type": "application/json",
+    "Accept-Encoding": "identity",
+}
+
+# Enforce GPU usage and Kokoro's import paths for the child server. Built once, leaving os.environ untouched.
+_KOKORO_ENV = {**os.environ, "USE_GPU": "true", "DEVICE_TYPE": "cuda", "PYTHONPATH": "/app:/app/api"}
+
+# Set KOKORO_DIAG=true to print nvidia-smi/torch diagnostics before starting the server (slow; off by default).
+KOKORO_DIAG = os.environ.get("KOKORO_DIAG", "false").lower() in ("1", "true", "yes")
+
+# Opt-in: host Kokoro's ASGI app inside this process instead of a child server.
+KOKORO_IN_PROCESS = os.environ.get("KOKORO_IN_PROCESS", "false").lower() in ("1", "true", "yes")
+
+
+class SpeechRequest(msgspec.Struct):
+    """
+    Kokoro's OpenAI-compatible `/v1/audio/speech` body. Validated and encoded in one C pass;
+    optional fields left UNSET are omitted so Kokoro applies its own defaults. Nullable fields
+    mirror Kokoro's `OpenAISpeechRequest`; keys outside this Struct are not forwarded.
+    """
+    input: str
+    model: str = "kokoro"
+    voice: Union[str, UnsetType] = UNSET
+    response_format: str = "mp3"
+    speed: Union[float, UnsetType] = UNSET
+    stream: bool = False
+    return_download_link: Union[bool, UnsetType] = UNSET
+    download_format: Union[str, None, UnsetType] = UNSET
+    lang_code: Union[str, None, UnsetType] = UNSET
+    volume_multiplier: Union[float, None, UnsetType] = UNSET
+    normalization_options: Union[Dict[str, Any], None, UnsetType] = UNSET
+
 
 _kokoro_proc: Optional[subprocess.Popen] = None
 
+# Cap on a pending (newline-less) chunk of server output kept in memory by the log reader
+_LOG_BUFFER_MAX = 1_000_000
+
+# In-process Kokoro state (only populated when KOKORO_IN_PROCESS is enabled and the import succeeds)
+_inproc_loop: Optional[asyncio.AbstractEventLoop] = None
+_inproc_client: Any = None
+
+# Set by the log reader when uvicorn reports "Application startup complete"
+_server_started = threading.Event()
+
+# Set once the import-time background provisioning attempt has finished
+_ready_event = threading.Event()
+_ensure_lock = threading.Lock()
+
+# Set once the throwaway warm-up synth has finished (successfully or not)
+_warmup_done = threading.Event()
+
 
 def log(msg: str):
     """Simple logging helper to ensure flush."""
@@ -30,6 +100,9 @@ def log(msg: str):
 
 
 def _print_system_diagnostics():
+    if not KOKORO_DIAG:
+        return
+
     log("--- System Diagnostics ---")
     
     # 1. Check NVIDIA-SMI
@@ -40,8 +113,14 @@ def _print_system_diagnostics():
     except Exception as e:
         log(f"Error running nvidia-smi: {e}")
 
-    # 2. Check PyTorch CUDA
-    if TORCH_AVAILABLE:
+    # 2. Check PyTorch CUDA (imported lazily; torch is heavy and the worker doesn't otherwise need it)
+    try:
+        import torch
+        torch_available = True
+    except ImportError:
+        torch_available = False
+
+    if torch_available:
         try:
             log(f"Torch version: {torch.__version__}")
             cuda_available = torch.cuda.is_available()
@@ -64,22 +143,111 @@ def _print_system_diagnostics():
     log("-------------------------")
 
 
+def _log_server_line(line: bytes) -> None:
+    line_str = line.decode("utf-8", errors="replace").strip()
+    if line_str:
+        print(f"[KokoroServer] {line_str}", flush=True)
+        if "Application startup complete" in line_str:
+            _server_started.set()
+
+
 def _stream_logs(process: subprocess.Popen):
-    """Reads stdout from the child process and logs it."""
+    """
+    Reads stdout from the child process and logs it.
+    Uses non-blocking reads with a bounded buffer so the child never stalls on a full pipe.
+    """
     if process.stdout is None:
         return
-    
-    # Iterate lines
-    for line in iter(process.stdout.readline, b""):
-        line_str = line.decode("utf-8", errors="replace").strip()
-        if line_str:
-            print(f"[KokoroServer] {line_str}", flush=True)
+
+    fd = process.stdout.fileno()
+    os.set_blocking(fd, False)
+    buf = b""
+    while True:
+        ready, _, _ = select.select([fd], [], [], 1.0)
+        if not ready:
+            continue
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            continue
+        if not chunk:
+            break
+
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            _log_server_line(line)
+        if len(buf) > _LOG_BUFFER_MAX:
+            buf = buf[-_LOG_BUFFER_MAX:]
+
+    if buf:
+        _log_server_line(buf)
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    """urllib3 connection that talks HTTP over a Unix domain socket."""
+
+    def __init__(self, *args: Any, socket_path: str, **kwargs: Any):
+        self.socket_path = socket_path
+        super().__init__(*args, **kwargs)
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class _UnixHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _UnixHTTPConnection
+
+
+def _new_kokoro_pool(socket_path: Optional[str]) -> Any:
+    """
+    Keep-alive pool for the local Kokoro server: TCP when `socket_path` is None, else the Unix socket.
+    A single host, so one pool with room for concurrent jobs; no retries, since a failed synth
+    should surface immediately.
+    """
+    if socket_path is None:
+        return urllib3.PoolManager(num_pools=1, maxsize=16, block=False, headers=KOKORO_HEADERS, retries=False)
+    return _UnixHTTPConnectionPool(
+        "localhost", socket_path=socket_path, maxsize=16, block=False, headers=KOKORO_HEADERS, retries=False
+    )
+
+
+# Global pool shared by speech calls and the /health probe, plus the Unix socket it targets (None = TCP).
+# Switched by _use_kokoro_transport() to match how the server was last started.
+_http: Any = _new_kokoro_pool(None)
+_http_socket_path: Optional[str] = None
+
+
+def _use_kokoro_transport(socket_path: Optional[str]) -> None:
+    """Routes health/speech requests over TCP (None) or the given Unix socket, closing the old pool."""
+    global _http, _http_socket_path, KOKORO_HEALTH_URL, KOKORO_SPEECH_URL
+    if socket_path == _http_socket_path:
+        return
+
+    old = _http
+    _http = _new_kokoro_pool(socket_path)
+    _http_socket_path = socket_path
+    if socket_path is None:
+        KOKORO_HEALTH_URL = f"{KOKORO_BASE_URL}{KOKORO_HEALTH_PATH}"
+        KOKORO_SPEECH_URL = f"{KOKORO_BASE_URL}{KOKORO_SPEECH_PATH}"
+    else:
+        KOKORO_HEALTH_URL = KOKORO_HEALTH_PATH
+        KOKORO_SPEECH_URL = KOKORO_SPEECH_PATH
+
+    if isinstance(old, urllib3.PoolManager):
+        old.clear()
+    else:
+        old.close()
 
 
 def _is_kokoro_up(timeout_s: float = 1.0) -> bool:
     try:
-        r = requests.get(KOKORO_HEALTH_URL, timeout=timeout_s)
-        return r.status_code == 200
+        r = _http.request("GET", KOKORO_HEALTH_URL, timeout=timeout_s)
+        return r.status == 200
     except Exception:
         return False
 
@@ -94,12 +262,8 @@ def _start_kokoro_server() -> None:
 
     _print_system_diagnostics()
 
-    # Enforce GPU usage in the environment
-    os.environ["USE_GPU"] = "true"
-    os.environ["DEVICE_TYPE"] = "cuda"
-    os.environ["PYTHONPATH"] = "/app:/app/api"
-
     log("Starting internal Kokoro-FastAPI server...")
+    _server_started.clear()
     
     # Try entrypoint script first
     try:
@@ -111,80 +275,296 @@ def _start_kokoro_server() -> None:
                 cwd="/app",
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                env=os.environ.copy(),
+                env=_KOKORO_ENV,
             )
+            # The entrypoint serves on TCP (KOKORO_BASE_URL)
+            _use_kokoro_transport(None)
         else:
             raise FileNotFoundError("entrypoint.sh not found")
             
     except Exception as e:
         log(f"Entrypoint failed or missing: {e}. Falling back to direct uvicorn...")
-        # Fallback: Run uvicorn directly using the same command as the other user's stable version
+        # Fallback: Run uvicorn directly, listening on a Unix socket to skip the loopback TCP stack
+        if os.path.exists(KOKORO_UDS_PATH):
+            os.unlink(KOKORO_UDS_PATH)
         _kokoro_proc = subprocess.Popen(
-            [sys.executable, "-m", "uvicorn", "api.src.main:app", "--host", "0.0.0.0", "--port", "8880"],
+            [sys.executable, "-m", "uvicorn", "api.src.main:app", "--uds", KOKORO_UDS_PATH],
             cwd="/app",
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            env=os.environ.copy(),
+            env=_KOKORO_ENV,
         )
+        _use_kokoro_transport(KOKORO_UDS_PATH)
         
     # Start log streaming
     t = threading.Thread(target=_stream_logs, args=(_kokoro_proc,), daemon=True)
     t.start()
 
 
+def _start_kokoro_in_process(wait_timeout_s: float = 300.0) -> bool:
+    """
+    Imports Kokoro's FastAPI app and serves it in-process through httpx.ASGITransport.
+    Returns False if the app cannot be imported, so the caller can fall back to the child server.
+    """
+    global _inproc_loop, _inproc_client
+    if _inproc_client is not None:
+        return True
+
+    # Kokoro reads its device settings at import time, so in-process they must live in os.environ
+    os.environ["USE_GPU"] = _KOKORO_ENV["USE_GPU"]
+    os.environ["DEVICE_TYPE"] = _KOKORO_ENV["DEVICE_TYPE"]
+    for path in ("/app", "/app/api"):
+        if path not in sys.path:
+            sys.path.append(path)
+
+    try:
+        import httpx
+        from api.src.main import app as kokoro_app
+    except Exception as e:
+        log(f"In-process Kokoro unavailable ({e}). Falling back to the local server...")
+        return False
+
+    log("Starting Kokoro in-process (ASGI)...")
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    # ASGITransport does not emit lifespan events, so run the app's startup (model load) ourselves.
+    lifespan = kokoro_app.router.lifespan_context(kokoro_app)
+    try:
+        asyncio.run_coroutine_threadsafe(lifespan.__aenter__(), loop).result(timeout=wait_timeout_s)
+    except Exception as e:
+        log(f"In-process Kokoro startup failed ({e}). Falling back to the local server...")
+        loop.call_soon_threadsafe(loop.stop)
+        return False
+
+    _inproc_loop = loop
+    _inproc_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=kokoro_app),
+        base_url="http://kokoro",
+    )
+    log("Kokoro in-process app is ready!")
+    return True
+
+
 def _ensure_kokoro_ready(wait_timeout_s: float = 300.0) -> None:
     """Waits for the Kokoro server to be healthy, allowing time for model downloads."""
-    if _is_kokoro_up():
-        return
+    # Serialized so the background provisioner and a job never start two servers
+    with _ensure_lock:
+        if _inproc_client is not None:
+            return
 
-    _start_kokoro_server()
-
-    log("Waiting for Kokoro server to be healthy (this may take a few minutes if seeds are being downloaded)...")
-    start = time.time()
-    while time.time() - start < wait_timeout_s:
-        if _kokoro_proc is not None:
-            ret = _kokoro_proc.poll()
-            if ret is not None:
-                log(f"CRITICAL: Kokoro server process exited unexpectedly with code {ret}")
-                # Log last few lines if possible
-                raise RuntimeError(f"Kokoro server process exited during startup with code {ret}")
-        
-        if _is_kokoro_up(timeout_s=2.0):
-            log("Kokoro server is ready!")
+        if _is_kokoro_up():
+            return
+
+        if KOKORO_IN_PROCESS and _start_kokoro_in_process(wait_timeout_s):
             return
+
+        _start_kokoro_server()
+
+        log("Waiting for Kokoro server to be healthy (this may take a few minutes if seeds are being downloaded)...")
+        start = time.time()
+        delay = 0.025
+        while time.time() - start < wait_timeout_s:
+            if _kokoro_proc is not None:
+                ret = _kokoro_proc.poll()
+                if ret is not None:
+                    log(f"CRITICAL: Kokoro server process exited unexpectedly with code {ret}")
+                    # Log last few lines if possible
+                    raise RuntimeError(f"Kokoro server process exited during startup with code {ret}")
         
-        # Sleep slightly longer to avoid spamming logs while waiting for massive downloads
-        time.sleep(2.0)
+            # Exponential backoff from 25ms to 1s; the startup log line wakes us immediately
+            started = _server_started.wait(timeout=delay)
+            if _is_kokoro_up(timeout_s=2.0 if started else 0.2):
+                log("Kokoro server is ready!")
+                return
+            if started:
+                time.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
+
+        log("Timed out waiting for Kokoro server to start.")
+        raise TimeoutError("Timed out waiting for Kokoro server to become ready")
+
+
+# Separate pool for uploading results to caller-provided (presigned) URLs
+_upload_http = urllib3.PoolManager(retries=urllib3.Retry(total=3, backoff_factor=0.5))
+
+
+def _post_in_process(body: bytes) -> Any:
+    """Dispatches the speech request straight into the in-process ASGI app (no socket)."""
+    future = asyncio.run_coroutine_threadsafe(
+        _inproc_client.post(KOKORO_SPEECH_PATH, content=body, headers=KOKORO_HEADERS),
+        _inproc_loop,
+    )
+    # ASGITransport ignores httpx timeouts, so bound the wait here instead
+    try:
+        return future.result(timeout=KOKORO_SPEECH_TIMEOUT_S)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise urllib3.exceptions.ReadTimeoutError(
+            None, KOKORO_SPEECH_PATH, f"Read timed out. (read timeout={KOKORO_SPEECH_TIMEOUT_S})"
+        )
 
-    log("Timed out waiting for Kokoro server to start.")
-    raise TimeoutError("Timed out waiting for Kokoro server to become ready")
+
+def _parse_sample_rate(content_type: str) -> int:
+    """Reads the `rate` parameter from e.g. `audio/pcm; rate=24000`."""
+    msg = Message()
+    msg["content-type"] = content_type
+    try:
+        return int(msg.get_param("rate", KOKORO_DEFAULT_SAMPLE_RATE))
+    except (TypeError, ValueError):
+        return KOKORO_DEFAULT_SAMPLE_RATE
 
 
-# Global session for connection pooling
-_session = requests.Session()
+def _logged_chunks(
+    chunks: Iterable[bytes], t0: float, mime: str, sample_rate: int, release: Optional[Callable[[], None]] = None
+) -> Iterator[bytes]:
+    """Passes audio chunks through, logging the totals once the body has been fully read."""
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        if release is not None:
+            release()
+    log(f"Generated audio in {time.time() - t0:.2f}s | Size: {size} bytes | Mime: {mime} | Rate: {sample_rate}")
 
 
-def _call_kokoro_openai_speech(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+def _stream_kokoro_openai_speech(req: SpeechRequest) -> Tuple[Iterator[bytes], str, int]:
+    """
+    POSTs to Kokoro and returns the audio body as an iterator of AUDIO_CHUNK_SIZE chunks,
+    without materializing it as one bytes object.
+    """
     # Force non-streaming for queue-based mode.
-    payload = dict(payload)
-    payload["stream"] = False
+    req.stream = False
+    body = msgspec.json.encode(req)
 
     t0 = time.time()
-    r = _session.post(KOKORO_SPEECH_URL, json=payload, timeout=300)
-    dur = time.time() - t0
+    release = None
+    if _inproc_client is not None:
+        r = _post_in_process(body)
+        status, headers = r.status_code, r.headers
+        chunks: Iterable[bytes] = (r.content,)
+    else:
+        r = _http.urlopen("POST", KOKORO_SPEECH_URL, body=body, timeout=KOKORO_SPEECH_TIMEOUT_S, preload_content=False)
+        status, headers = r.status, r.headers
+        chunks = r.stream(AUDIO_CHUNK_SIZE)
+        release = r.release_conn
     
-    if r.status_code != 200:
-        log(f"Kokoro API Error ({r.status_code}): {r.text}")
-        raise ValueError(f"Kokoro error {r.status_code}: {r.text}")
+    if status != 200:
+        try:
+            err = b"".join(chunks).decode("utf-8", errors="replace")
+        finally:
+            if release is not None:
+                release()
+        log(f"Kokoro API Error ({status}): {err}")
+        raise ValueError(f"Kokoro error {status}: {err}")
     
-    mime = r.headers.get("content-type", "application/octet-stream")
-    log(f"Generated audio in {dur:.2f}s | Size: {len(r.content)} bytes | Mime: {mime}")
-    return r.content, mime
+    mime = headers.get("content-type", "application/octet-stream")
+    sample_rate = _parse_sample_rate(mime)
+    return _logged_chunks(chunks, t0, mime, sample_rate, release), mime, sample_rate
+
+
+def _call_kokoro_openai_speech(req: SpeechRequest) -> Tuple[bytes, str, int]:
+    chunks, mime, sample_rate = _stream_kokoro_openai_speech(req)
+    return b"".join(chunks), mime, sample_rate
+
+
+def _b64encode_chunks(chunks: Iterable[bytes]) -> str:
+    """
+    Base64-encodes a chunk stream piece by piece so each piece stays cache-resident.
+    Pieces are cut on 3-byte boundaries, so no padding appears mid-stream.
+    """
+    parts = []
+    carry = b""
+    for chunk in chunks:
+        if carry:
+            chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 3
+        parts.append(pybase64.b64encode(memoryview(chunk)[:cut]))
+        carry = chunk[cut:]
+    parts.append(pybase64.b64encode(carry))
+    return b"".join(parts).decode("ascii")
+
+
+def _warmup() -> None:
+    """Runs a tiny synth so CUDA context/allocator/cuDNN init happens before the first real job."""
+    try:
+        t0 = time.time()
+        _call_kokoro_openai_speech(SpeechRequest(input="a", voice="af_bella"))
+        log(f"Warm-up synth finished in {time.time() - t0:.2f}s")
+    except Exception as e:
+        log(f"Warm-up synth failed (continuing): {e}")
+    finally:
+        _warmup_done.set()
+
+
+def _upload_audio(url: str, audio_bytes: bytes, mime_type: str) -> None:
+    """PUTs the raw audio to a presigned URL (e.g. S3), skipping base64 in the job output."""
+    t0 = time.time()
+    r = _upload_http.request(
+        "PUT", url, body=audio_bytes, headers={"Content-Type": mime_type}, timeout=300
+    )
+    if r.status >= 300:
+        err = r.data.decode("utf-8", errors="replace")
+        log(f"Upload Error ({r.status}): {err}")
+        raise ValueError(f"Upload error {r.status}: {err}")
+    log(f"Uploaded audio in {time.time() - t0:.2f}s | Size: {len(audio_bytes)} bytes")
+
+
+def _wait_for_kokoro() -> None:
+    # Provisioning runs in the background at import; wait for it, then re-check health
+    # (this restarts the server if it has died since)
+    _ready_event.wait(timeout=300)
+    _ensure_kokoro_ready()
+    # Don't race the warm-up synth for the GPU on the first job
+    _warmup_done.wait(timeout=60)
+
+
+def _to_speech_request(job_input: Dict[str, Any]) -> SpeechRequest:
+    """
+    Builds the outbound request from known fields only, without copying or mutating `job_input`
+    (unknown keys such as `text` or `output_s3_url` are ignored by the Struct).
+    """
+    if "input" not in job_input:
+        if "text" not in job_input:
+            raise ValueError("Missing required field: 'input' or 'text'")
+        # Map the 'text' alias; the only path that builds a new dict
+        job_input = {**job_input, "input": job_input["text"]}
+
+    try:
+        # Lax mode coerces "1.0"/"false" like Kokoro's pydantic validation does
+        return msgspec.convert(job_input, SpeechRequest, strict=False)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"Invalid input: {e}") from e
+
+
+def synth_to_file(payload: Dict[str, Any], out_path: str) -> Dict[str, Any]:
+    """
+    Synthesizes `payload` straight into `out_path`, skipping base64 entirely.
+    Intended for local runs/benchmarks; returns the same metadata as the handler.
+    """
+    _wait_for_kokoro()
+    req = _to_speech_request(payload)
+    chunks, mime_type, sample_rate = _stream_kokoro_openai_speech(req)
+
+    size = 0
+    with open(out_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+
+    return {
+        "mime_type": mime_type,
+        "format": req.response_format,
+        "sample_rate": sample_rate,
+        "bytes": size,
+    }
 
 
 def handler(job: Dict[str, Any]) -> Dict[str, Any]:
     """
-    RunPod queue-based handler. Acts as a transparent proxy to the internal FastAPI.
+    RunPod queue-based handler. Validates the input as a SpeechRequest and proxies it to the internal FastAPI.
     """
     log(f"Received jobID: {job.get('id')}")
     
@@ -192,29 +572,49 @@ def handler(job: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(job_input, dict):
         raise ValueError("job['input'] must be an object")
 
-    # Ensure background server is running
-    _ensure_kokoro_ready()
+    # Worker-only option; not part of Kokoro's request schema. Checked before any GPU work, and
+    # https-only so audio can't be PUT at the plain-HTTP local Kokoro server.
+    output_url = job_input.get("output_s3_url")
+    if output_url is not None:
+        parts = urlsplit(output_url) if isinstance(output_url, str) else None
+        if parts is None or parts.scheme != "https" or not parts.netloc:
+            raise ValueError("output_s3_url must be an https URL")
+
+    _wait_for_kokoro()
+
+    req = _to_speech_request(job_input)
+
+    # Call internal API with the validated payload
+    result: Dict[str, Any] = {}
+    if output_url:
+        audio_bytes, mime_type, sample_rate = _call_kokoro_openai_speech(req)
+        _upload_audio(output_url, audio_bytes, mime_type)
+        # Drop the presigned query string; it only authorizes the upload
+        result["audio_url"] = output_url.split("?", 1)[0]
+    else:
+        chunks, mime_type, sample_rate = _stream_kokoro_openai_speech(req)
+        result["audio_base64"] = _b64encode_chunks(chunks)
 
-    # Prepare payload: Map 'text' alias to 'input' if 'input' is missing
-    if "text" in job_input and "input" not in job_input:
-        job_input["input"] = job_input.pop("text")
-    
-    if "input" not in job_input:
-         raise ValueError("Missing required field: 'input' or 'text'")
+    result.update({
+        "mime_type": mime_type,
+        "format": req.response_format,
+        "sample_rate": sample_rate,
+    })
+    return result
 
-    # Call internal API with the raw payload
-    audio_bytes, mime_type = _call_kokoro_openai_speech(job_input)
 
-    return {
-        "audio_base64": base64.b64encode(audio_bytes).decode("utf-8"),
-        "mime_type": mime_type,
-        "format": job_input.get("response_format", job_input.get("format", "mp3")),
-        "sample_rate": 24000,
-    }
+def _provision() -> None:
+    """Starts and warms up Kokoro off the main thread so worker registration isn't blocked."""
+    try:
+        _ensure_kokoro_ready()
+    except Exception as e:
+        log(f"Background Kokoro startup failed (will retry on first job): {e}")
+    _ready_event.set()
+    _warmup()
 
 
-# Ensure background server is running during provision
-_ensure_kokoro_ready()
+# Start the background server during provision without blocking RunPod worker startup
+threading.Thread(target=_provision, daemon=True).start()
 
 if __name__ == "__main__":
     runpod.serverless.start({"handler": handler})
@@ -1,37 +1,21 @@
-import base64
-
-from runpod_worker.handler import handler
+from runpod_worker.handler import synth_to_file
 
 
 def main() -> None:
-    job = {
-        "input": {
-            "model": "kokoro",
-            "input": "Hello world!",
-            "voice": "af_bella",
-            "response_format": "mp3",
-            "speed": 1.0,
-            "stream": False,
-        }
+    payload = {
+        "model": "kokoro",
+        "input": "Hello world!",
+        "voice": "af_bella",
+        "response_format": "mp3",
+        "speed": 1.0,
+        "stream": False,
     }
 
-    out = handler(job)
-    audio_b64 = out["audio_base64"]
-    audio_bytes = base64.b64decode(audio_b64.encode("utf-8"))
-
-    with open("output.mp3", "wb") as f:
-        f.write(audio_bytes)
+    # Write the audio directly; no base64 round-trip through the handler output
+    out = synth_to_file(payload, "output.mp3")
 
-    print(
-        {
-            "mime_type": out.get("mime_type"),
-            "format": out.get("format"),
-            "sample_rate": out.get("sample_rate"),
-            "bytes": len(audio_bytes),
-        }
-    )
+    print(out)
 
 
 if __name__ == "__main__":
     main()
-